@@ -21,6 +21,10 @@ class AudioPlayer:
         self._stop_event = threading.Event()
         self._stream_lock = threading.Lock()
 
+        # When the first sample after the output_delay prefix reaches the speaker
+        self.playback_start_time = None
+        self._playback_started = threading.Event()
+
     def stop(self):
         """Immediately stops any currently playing audio."""
         if self._play_thread and self._play_thread.is_alive():
@@ -29,6 +33,9 @@ class AudioPlayer:
             self._play_thread.join(timeout=2.0)  # Wait for thread to clean up
 
     def play_local_wav(self, file_path, loop_duration=0, blocking=False):
+        # A missing or broken file must not leave a previous sound's start time
+        self._playback_started.clear()
+        self.playback_start_time = None
         if not file_path or not os.path.exists(file_path):
             return
         try:
@@ -49,11 +56,14 @@ class AudioPlayer:
         """Prepares audio and plays it either blockingly or in a background thread."""
         self.stop()
         self._stop_event.clear()
+        self._playback_started.clear()
+        self.playback_start_time = None
 
         normalized_audio = audio_segment.set_frame_rate(self.OUTPUT_RATE).set_channels(
             self.settings.output_channels
         )
 
+        delay_ms = 0
         if (
             hasattr(self.settings, "output_delay")
             and self.settings.output_delay
@@ -68,17 +78,30 @@ class AudioPlayer:
         if blocking:
             # Run synchronously on the current thread.
             # This pauses the calling code until the audio finishes playing.
-            self._playback_worker(normalized_audio, loop_duration)
+            self._playback_worker(normalized_audio, loop_duration, delay_ms)
         else:
             # Spawn a background thread for non-blocking playback (alarms, TTS)
             self._play_thread = threading.Thread(
                 target=self._playback_worker,
-                args=(normalized_audio, loop_duration),
+                args=(normalized_audio, loop_duration, delay_ms),
                 daemon=True,
             )
             self._play_thread.start()
 
-    def _playback_worker(self, audio_segment: AudioSegment, loop_duration: float):
+    def wait(self, timeout=None):
+        """Blocks until the current background playback has finished."""
+        if self._play_thread and self._play_thread.is_alive():
+            self._play_thread.join(timeout)
+
+    def wait_for_playback_start(self, timeout=None):
+        """Waits for the current sound to start and returns playback_start_time."""
+        if not self._playback_started.wait(timeout):
+            return None
+        return self.playback_start_time
+
+    def _playback_worker(
+        self, audio_segment: AudioSegment, loop_duration: float, delay_ms: int = 0
+    ):
         """Runs in a background thread, pushing chunks and handling loops."""
         speaker_stream = None
         try:
@@ -105,6 +128,14 @@ class AudioPlayer:
                 end_pointer = min(pointer + chunk_size, data_length)
                 chunk = raw_data[pointer:end_pointer]
 
+                if not self._playback_started.is_set():
+                    self.playback_start_time = (
+                        time.time()
+                        + speaker_stream.get_output_latency()
+                        + delay_ms / 1000
+                    )
+                    self._playback_started.set()
+
                 speaker_stream.write(chunk)
                 pointer = end_pointer
 
@@ -140,7 +171,12 @@ class AudioPlayer:
 
 
 def record_until_silence(
-    mic_stream, vad_model, rate=16000, max_seconds=15, silence_timeout=3.0
+    mic_stream,
+    vad_model,
+    rate=16000,
+    max_seconds=15,
+    silence_timeout=3.0,
+    chime_suppressor=None,
 ):
     logger.info("Listening for command...")
     vad_model.reset_states()
@@ -148,10 +184,20 @@ def record_until_silence(
     SILERO_CHUNK = 512
     start_time = time.time()
     last_speech_time = time.time()
+    no_speech_start = start_time
     has_spoken = False
 
+    # Sample clock for the chime canceller: per-read wall-clock times jitter
+    clock_start = None
+    samples_read = 0
+
     processed_frames = []
-    ring_buffer = collections.deque(maxlen=20)
+    ring_size = 20
+    if chime_suppressor and chime_suppressor.start_time is not None:
+        # Keep everything captured while the chime plays until the VAD can decide on it
+        chime_end = chime_suppressor.start_time + chime_suppressor.duration
+        ring_size += int(max(0.0, chime_end - start_time) * rate / SILERO_CHUNK) + 1
+    ring_buffer = collections.deque(maxlen=ring_size)
     hangover_time = 0.8
 
     try:
@@ -166,12 +212,31 @@ def record_until_silence(
 
     while (time.time() - start_time) < max_seconds:
         data = mic_stream.read(SILERO_CHUNK, exception_on_overflow=False)
-        speech_prob = vad_model.process(data, rate)
         current_time = time.time()
 
-        if speech_prob > 0.3:
+        if clock_start is None:
+            clock_start = current_time - len(data) / (2 * rate)
+        samples_read += len(data) // 2
+
+        chime_audible = False
+        if chime_suppressor:
+            data, chime_audible = chime_suppressor.process(
+                data, clock_start + samples_read / rate
+            )
+
+        speech_prob = vad_model.process(data, rate)
+
+        # The residual echo of the chime must not start a recording on its
+        # own, so speech has to be clearer while the chime can be heard
+        speech_threshold = 0.7 if chime_audible else 0.3
+        if speech_prob > speech_threshold:
             last_speech_time = current_time
             has_spoken = True
+        elif chime_audible:
+            # Hold both timeouts until the chime is over
+            no_speech_start = current_time
+            if has_spoken:
+                last_speech_time = current_time
 
         if has_spoken and (current_time - last_speech_time) < hangover_time:
             while ring_buffer:
@@ -182,7 +247,7 @@ def record_until_silence(
 
         if has_spoken and (current_time - last_speech_time) > silence_timeout:
             break
-        elif not has_spoken and (current_time - start_time) > 3.0:
+        elif not has_spoken and (current_time - no_speech_start) > 3.0:
             break
 
     return b"".join(processed_frames)
@@ -0,0 +1,269 @@
+import os
+import wave
+import logging
+import numpy as np
+
+logger = logging.getLogger("Satellite.AudioProcessing")
+
+SILERO_CHUNK = 512
+
+
+def trim_silence(audio_bytes, vad_model, rate=16000, margin=0.2, threshold=0.3):
+    """
+    Cuts leading and trailing non-speech from a recorded command.
+
+    Runs the VAD over the whole utterance in one pass and keeps everything
+    between the first and last speech frame, padded by `margin` seconds on
+    both sides. Audio without any detected speech is returned unchanged.
+    """
+    vad_model.reset_states()
+    probs = vad_model.process_buffer(audio_bytes, rate, chunk_size=SILERO_CHUNK)
+    vad_model.reset_states()
+
+    speech_frames = np.flatnonzero(probs > threshold)
+    if len(speech_frames) == 0:
+        logger.debug("No speech found while trimming, keeping full recording")
+        return audio_bytes
+
+    margin_samples = int(margin * rate)
+    start = max(0, speech_frames[0] * SILERO_CHUNK - margin_samples)
+    end = (speech_frames[-1] + 1) * SILERO_CHUNK + margin_samples
+
+    # Two bytes per int16 sample
+    return audio_bytes[start * 2 : end * 2]
+
+
+def normalize_gain(audio_bytes, target_dbfs=-3.0, max_gain_db=20.0):
+    """Scales the recording so its peak hits target_dbfs, capped at max_gain_db."""
+    samples = np.frombuffer(audio_bytes, dtype=np.int16)
+    if len(samples) == 0:
+        return audio_bytes
+
+    peak = np.max(np.abs(samples.astype(np.int32)))
+    if peak == 0:
+        return audio_bytes
+
+    target_peak = 32767.0 * 10 ** (target_dbfs / 20.0)
+    gain = min(target_peak / peak, 10 ** (max_gain_db / 20.0))
+    scaled = np.clip(samples.astype(np.float32) * gain, -32768, 32767)
+    return scaled.astype(np.int16).tobytes()
+
+
+def postprocess_command(audio_bytes, vad_model, settings, rate=16000):
+    """Applies the configured trimming and gain normalization to a recorded command."""
+    original_size = len(audio_bytes)
+
+    if settings.trim_silence:
+        audio_bytes = trim_silence(
+            audio_bytes, vad_model, rate=rate, margin=settings.trim_margin
+        )
+    if settings.normalize_gain:
+        audio_bytes = normalize_gain(audio_bytes, target_dbfs=settings.normalize_dbfs)
+
+    logger.debug(
+        f"Post-processed command: {original_size / (2 * rate):.2f}s -> "
+        f"{len(audio_bytes) / (2 * rate):.2f}s"
+    )
+    return audio_bytes
+
+
+class ChimeSuppressor:
+    """
+    Removes a known playback signal (the wake chime) from microphone chunks.
+
+    The chime is treated as a single echo path: for each chunk captured while
+    it plays, the matching part of the reference is located by
+    cross-correlation around the expected position, scaled by a least-squares
+    gain and subtracted. Once a confident alignment is found, later chunks
+    only search within `track` seconds of it to follow small drifts.
+
+    Chunk times must come from a sample clock (first read time plus samples
+    read), not from time.time() per read: a millisecond of jitter is already
+    16 samples of misalignment.
+    """
+
+    def __init__(
+        self,
+        reference,
+        rate=16000,
+        max_lag=0.25,
+        tail=0.2,
+        audible_level=0.05,
+        track=0.002,
+    ):
+        self.reference = np.asarray(reference, dtype=np.float32)
+        # Parts of the reference quieter than this fraction of its peak are ignored
+        peak = float(np.max(np.abs(self.reference))) if len(self.reference) else 0.0
+        self.audible_threshold = audible_level * peak
+        self.rate = rate
+        self.max_lag = int(max_lag * rate)
+        self.tail = int(tail * rate)
+        self.track = int(track * rate)
+        self.start_time = None
+        self._lag = None
+        self._padded = None
+
+    @classmethod
+    def from_wav(cls, file_path, rate=16000, **kwargs):
+        from pydub import AudioSegment
+
+        segment = (
+            AudioSegment.from_wav(file_path)
+            .set_frame_rate(rate)
+            .set_channels(1)
+            .set_sample_width(2)
+        )
+        return cls(np.array(segment.get_array_of_samples()), rate=rate, **kwargs)
+
+    @property
+    def duration(self):
+        """Seconds after start() during which captured audio may contain the chime."""
+        return (len(self.reference) + self.max_lag + self.tail) / self.rate
+
+    def start(self, playback_time):
+        """Marks the time.time() at which the chime starts leaving the speaker.
+
+        Use AudioPlayer.wait_for_playback_start() rather than a guess; echo
+        delays beyond max_lag cannot be aligned.
+        """
+        self.start_time = playback_time
+        self._lag = None
+
+    def is_active(self, now):
+        return (
+            self.start_time is not None
+            and self.start_time <= now < self.start_time + self.duration
+        )
+
+    def _padded_reference(self, n):
+        # Zero padding lets every candidate window be sliced without bounds checks
+        padded_len = len(self.reference) + self.max_lag + 2 * n
+        if self._padded is None or len(self._padded) != padded_len:
+            self._padded = np.pad(self.reference, (self.max_lag + n, n))
+        return self._padded
+
+    def _best_lag(self, samples, offset, lowest, highest):
+        """Returns the lag in [lowest, highest] samples that best matches the chunk."""
+        n = len(samples)
+        # Padded index of the reference sample aligned with the chunk at `highest`
+        start = offset - highest + self.max_lag + n
+        window = self._padded[start : start + highest - lowest + n]
+        if len(window) < n:
+            return lowest
+        corr = np.correlate(window, samples, mode="valid")
+        return highest - int(np.argmax(corr))
+
+    def process(self, data, capture_time):
+        """
+        Returns the chunk with the chime removed and whether the chime is audible in it.
+
+        capture_time is the sample-clock time.time() of the end of the chunk.
+        """
+        if not self.is_active(capture_time):
+            return data, False
+
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        n = len(samples)
+        # Reference index of the first sample in this chunk if there were no latency.
+        # Playback and capture latency only ever move the echo later, i.e. to a
+        # smaller reference index, so candidate lags run from 0 to max_lag.
+        offset = round((capture_time - self.start_time) * self.rate) - n
+        padded = self._padded_reference(n)
+
+        # Every reference sample that can end up in this chunk for any lag
+        window_start = offset + n
+        window = padded[window_start : window_start + self.max_lag + n]
+        if len(window) < n or np.max(np.abs(window)) <= self.audible_threshold:
+            return data, False
+
+        if self._lag is None:
+            lag = self._best_lag(samples, offset, 0, self.max_lag)
+        else:
+            lag = self._best_lag(
+                samples,
+                offset,
+                max(0, self._lag - self.track),
+                min(self.max_lag, self._lag + self.track),
+            )
+            self._lag = lag
+
+        ref_start = offset - lag + self.max_lag + n
+        aligned = padded[ref_start : ref_start + n]
+        if len(aligned) < n:
+            return data, True
+
+        ref_energy = float(np.dot(aligned, aligned))
+        if ref_energy == 0.0:
+            return data, True
+
+        gain = max(0.0, float(np.dot(samples, aligned)) / ref_energy)
+
+        if self._lag is None:
+            # Lock the alignment once the reference explains the chunk well
+            coherence = float(np.dot(samples, aligned)) / np.sqrt(
+                ref_energy * float(np.dot(samples, samples)) + 1e-9
+            )
+            if coherence > 0.6:
+                self._lag = lag
+                logger.debug(f"Chime echo aligned at {lag / self.rate * 1000:.0f} ms")
+
+        cleaned = np.clip(samples - gain * aligned, -32768, 32767)
+        return cleaned.astype(np.int16).tobytes(), True
+
+
+def main():
+    """Trims (and optionally normalizes) stored 16 kHz mono WAV clips offline."""
+    import argparse
+    from vad import ensure_silero_vad_model, SileroVAD
+
+    parser = argparse.ArgumentParser(
+        description="Apply the satellite's command post-processing to WAV files"
+    )
+    parser.add_argument("files", nargs="+", help="16 kHz mono 16-bit WAV files")
+    parser.add_argument("--margin", type=float, default=0.2, help="Margin in seconds")
+    parser.add_argument(
+        "--normalize", action="store_true", help="Also apply gain normalization"
+    )
+    parser.add_argument("--target-dbfs", type=float, default=-3.0)
+    parser.add_argument(
+        "--output-dir", help="Where to write results (default: next to the input)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    vad_model = SileroVAD(ensure_silero_vad_model())
+
+    for path in args.files:
+        with wave.open(path, "rb") as wf:
+            if (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) != (
+                1,
+                2,
+                16000,
+            ):
+                logger.error(f"Skipping {path}: expected 16 kHz mono 16-bit audio")
+                continue
+            rate = wf.getframerate()
+            audio_bytes = wf.readframes(wf.getnframes())
+
+        processed = trim_silence(audio_bytes, vad_model, rate=rate, margin=args.margin)
+        if args.normalize:
+            processed = normalize_gain(processed, target_dbfs=args.target_dbfs)
+
+        base, ext = os.path.splitext(os.path.basename(path))
+        out_dir = args.output_dir or os.path.dirname(path)
+        out_path = os.path.join(out_dir, f"{base}.trimmed{ext}")
+        with wave.open(out_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(rate)
+            wf.writeframes(processed)
+
+        print(
+            f"{path}: {len(audio_bytes) / (2 * rate):.2f}s -> "
+            f"{len(processed) / (2 * rate):.2f}s "
+            f"({len(audio_bytes)} -> {len(processed)} bytes) -> {out_path}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Development micro-benchmark for the VAD hot path; not part of the installed
+package. Run from the repository root: python benchmark_vad.py --model PATH
+"""
+
+import gc
+import time
+import argparse
+import tracemalloc
+import numpy as np
+import onnxruntime as ort
+
+from vad import ensure_silero_vad_model, SileroVAD
+
+CHUNK = 512
+OWW_CHUNK = 1280
+
+
+class LegacySileroVAD:
+    """The previous per-chunk implementation, kept as the benchmark baseline."""
+
+    def __init__(self, model_path):
+        options = ort.SessionOptions()
+        options.inter_op_num_threads = 1
+        options.intra_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, sess_options=options)
+        self.state = np.zeros((2, 1, 128), dtype=np.float32)
+
+    def process(self, audio_chunk_int16, sr=16000):
+        audio_float32 = (
+            np.frombuffer(audio_chunk_int16, dtype=np.int16).astype(np.float32) / 32768.0
+        )
+        ort_inputs = {
+            "input": np.expand_dims(audio_float32, axis=0),
+            "state": self.state,
+            "sr": np.array(sr, dtype=np.int64),
+        }
+        out, self.state = self.session.run(None, ort_inputs)
+        return out[0][0]
+
+
+class LegacyOwwBuffer:
+    """The previous bytearray accumulation in audio_listening_loop."""
+
+    def __init__(self):
+        self.oww_buffer = bytearray()
+
+    def push(self, audio_data):
+        self.oww_buffer.extend(audio_data)
+        if len(self.oww_buffer) < OWW_CHUNK * 2:
+            return None
+        oww_chunk = self.oww_buffer[: OWW_CHUNK * 2]
+        self.oww_buffer = self.oww_buffer[OWW_CHUNK * 2 :]
+        return np.frombuffer(oww_chunk, dtype=np.int16)
+
+
+class PreallocatedOwwBuffer:
+    """The preallocated accumulation now used in audio_listening_loop."""
+
+    def __init__(self):
+        self.oww_buffer = np.zeros(OWW_CHUNK + CHUNK, dtype=np.int16)
+        self.oww_frame = self.oww_buffer[:OWW_CHUNK]
+        self.oww_fill = 0
+
+    def push(self, audio_data):
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        self.oww_buffer[self.oww_fill : self.oww_fill + len(samples)] = samples
+        self.oww_fill += len(samples)
+        if self.oww_fill < OWW_CHUNK:
+            return None
+        # The frame would be handed to openWakeWord before the shift below
+        remainder = self.oww_fill - OWW_CHUNK
+        self.oww_buffer[:remainder] = self.oww_buffer[OWW_CHUNK : self.oww_fill]
+        self.oww_fill = remainder
+        return self.oww_frame
+
+
+def measure(name, fn, chunks):
+    """Prints per-chunk latency, peak transient allocation and GC activity."""
+    # Warm up so one-time allocations inside onnxruntime are not counted
+    for chunk in chunks[:50]:
+        fn(chunk)
+
+    latencies = np.empty(len(chunks), dtype=np.float64)
+    gc_before = gc.get_stats()[0]["collections"]
+    for i, chunk in enumerate(chunks):
+        start = time.perf_counter_ns()
+        fn(chunk)
+        latencies[i] = time.perf_counter_ns() - start
+    gc_collections = gc.get_stats()[0]["collections"] - gc_before
+
+    tracemalloc.start()
+    peaks = np.empty(len(chunks), dtype=np.int64)
+    for i, chunk in enumerate(chunks):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn(chunk)
+        peaks[i] = tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    print(
+        f"{name:<31} mean {latencies.mean() / 1000:8.1f} us  "
+        f"p95 {np.percentile(latencies, 95) / 1000:8.1f} us  "
+        f"alloc/chunk {peaks.mean():8.0f} B  "
+        f"gen0 GCs {gc_collections}"
+    )
+
+
+def main():
+    """Compares the legacy and current hot paths on synthetic microphone chunks."""
+    parser = argparse.ArgumentParser(description="Benchmark the VAD inference hot path")
+    parser.add_argument("--model", help="Path to silero_vad.onnx (downloaded if unset)")
+    parser.add_argument("--chunks", type=int, default=2000, help="Chunks per run")
+    args = parser.parse_args()
+
+    model_path = args.model or ensure_silero_vad_model()
+    rng = np.random.default_rng(0)
+    chunks = [
+        rng.integers(-3000, 3000, CHUNK, dtype=np.int16).tobytes()
+        for _ in range(args.chunks)
+    ]
+
+    print(f"{args.chunks} chunks of {CHUNK} samples")
+    measure("SileroVAD (legacy)", LegacySileroVAD(model_path).process, chunks)
+    measure("SileroVAD (IOBinding)", SileroVAD(model_path).process, chunks)
+    measure("openWakeWord buffer (legacy)", LegacyOwwBuffer().push, chunks)
+    measure("openWakeWord buffer (prealloc)", PreallocatedOwwBuffer().push, chunks)
+
+
+if __name__ == "__main__":
+    main()
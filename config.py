@@ -58,6 +58,34 @@ class SatelliteSettings(BaseSettings):
         default=2,
         description="The silence duration in seconds after which command recording should stop",
     )
+    overlap_wake_sound: bool = Field(
+        default=False,
+        description="Start recording while the wake sound plays and cancel it from the recording",
+    )
+    trim_silence: bool = Field(
+        default=True,
+        description="Trim leading and trailing non-speech from commands before upload",
+    )
+    trim_margin: float = Field(
+        default=0.2,
+        description="Seconds of audio kept around the detected speech when trimming",
+    )
+    normalize_gain: bool = Field(
+        default=False,
+        description="Peak-normalize recorded commands before upload",
+    )
+    normalize_dbfs: float = Field(
+        default=-3.0, description="Target peak level in dBFS for gain normalization"
+    )
+    mic_share_name: Optional[str] = Field(
+        default=None,
+        description="Name of a shared memory ring buffer (/dev/shm/<name>) to publish the 16 kHz mic stream to. Disabled if unset",
+    )
+    mic_share_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        description="Amount of audio in seconds kept in the shared microphone ring buffer",
+    )
 
     # --- Context ---
     room: Optional[str] = Field(
@@ -114,6 +142,19 @@ def get_settings() -> SatelliteSettings:
     parser.add_argument("--output-delay", help="Output delay in seconds")
     parser.add_argument("--output-channels", help="The number of output channels")
     parser.add_argument("--use-vad")
+    parser.add_argument(
+        "--overlap-wake-sound", help="Record while the wake sound is playing"
+    )
+    parser.add_argument("--trim-silence", help="Trim silence from recorded commands")
+    parser.add_argument("--trim-margin", help="Margin kept around speech in seconds")
+    parser.add_argument("--normalize-gain", help="Peak-normalize recorded commands")
+    parser.add_argument("--normalize-dbfs", help="Normalization target in dBFS")
+    parser.add_argument(
+        "--mic-share-name", help="Shared memory name to publish mic audio to"
+    )
+    parser.add_argument(
+        "--mic-share-seconds", help="Length of the shared mic ring buffer in seconds"
+    )
     # Inside get_settings() function, add these to the parser:
     parser.add_argument("--wake-sound", help="Path to wake sound WAV")
     parser.add_argument("--done-sound", help="Path to done sound WAV")
@@ -1,4 +1,7 @@
+import sys
 import time
+import atexit
+import signal
 import logging
 import pyaudio
 import numpy as np
@@ -14,6 +17,8 @@ from storage_client import StorageClient
 from vad import ensure_silero_vad_model, SileroVAD
 from actions import handle_satellite_actions
 from audio_io import AudioPlayer, record_until_silence
+from audio_processing import postprocess_command, ChimeSuppressor
+from mic_share import MicSharePublisher, CaptureServer
 
 logging.basicConfig(
     level=settings.log_level,
@@ -26,6 +31,7 @@ FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
 CHUNK = 512  # Changed to 512 for continuous VAD
+OWW_CHUNK = 1280  # 80 ms frames expected by openWakeWord
 OUTPUT_RATE = 44100
 WAKEWORD_VAD_GATE_TIMEOUT = 0.8
 
@@ -36,6 +42,15 @@ def audio_listening_loop(loop, mqtt_queue, audio_manager, audio_player):
     owwModel = Model(wakeword_models=[settings.wakeword_models])
     silero_vad = SileroVAD(ensure_silero_vad_model())
 
+    chime_suppressor = None
+    if settings.overlap_wake_sound and settings.wake_sound:
+        try:
+            chime_suppressor = ChimeSuppressor.from_wav(
+                settings.wake_sound, rate=RATE
+            )
+        except Exception as e:
+            logger.error(f"Failed to load wake sound reference, not overlapping: {e}")
+
     mic_stream = audio_manager.open(
         format=FORMAT,
         channels=CHANNELS,
@@ -45,32 +60,60 @@ def audio_listening_loop(loop, mqtt_queue, audio_manager, audio_player):
         input_device_index=settings.mic_index,
     )
 
+    if settings.mic_share_name:
+        # Capture in a dedicated thread that publishes every chunk, so other
+        # local processes keep getting audio while this loop is busy
+        try:
+            mic_publisher = MicSharePublisher(
+                settings.mic_share_name,
+                rate=RATE,
+                sample_width=audio_manager.get_sample_size(FORMAT),
+                buffer_seconds=settings.mic_share_seconds,
+            )
+        except (OSError, ValueError) as e:
+            # Optional feature: never leave the satellite deaf because of it
+            logger.error(f"Not sharing microphone audio: {e}")
+        else:
+            mic_stream = CaptureServer(
+                mic_stream,
+                mic_publisher,
+                chunk=CHUNK,
+                rate=RATE,
+                sample_width=audio_manager.get_sample_size(FORMAT),
+            )
+            # The audio thread is a daemon and only ends with the process
+            atexit.register(mic_stream.close)
+
     logger.info(f"Microphone listening started. Room: {settings.room}")
     recent_speech_time = 0.0
-    oww_buffer = bytearray()
+    # Preallocated so accumulating openWakeWord frames does not reallocate per chunk
+    oww_buffer = np.zeros(OWW_CHUNK + CHUNK, dtype=np.int16)
+    oww_frame = oww_buffer[:OWW_CHUNK]
+    oww_fill = 0
 
     while True:
         try:
             audio_data = mic_stream.read(CHUNK, exception_on_overflow=False)
+            samples = np.frombuffer(audio_data, dtype=np.int16)
 
             # 1. VAD Check
-            if silero_vad.process(audio_data, RATE) > 0.5:
+            if silero_vad.process(samples, RATE) > 0.5:
                 recent_speech_time = time.time()
 
-            oww_buffer.extend(audio_data)
-
             # 2. Accumulate OpenWakeWord Chunks
-            if len(oww_buffer) < 2560:
+            oww_buffer[oww_fill : oww_fill + len(samples)] = samples
+            oww_fill += len(samples)
+            if oww_fill < OWW_CHUNK:
                 continue
 
-            oww_chunk = oww_buffer[:2560]
-            oww_buffer = oww_buffer[2560:]
-
             # 3. Predict Wakeword
-            audio_np = np.frombuffer(oww_chunk, dtype=np.int16)
-            prediction = owwModel.predict(audio_np)
+            prediction = owwModel.predict(oww_frame)
             confidence = prediction[settings.wakeword_models]
 
+            # Move the samples beyond the frame to the front for the next one
+            oww_buffer[: oww_fill - OWW_CHUNK] = oww_buffer[OWW_CHUNK:oww_fill]
+            oww_fill -= OWW_CHUNK
+
             if confidence < settings.wakeword_threshold:
                 continue
 
@@ -88,7 +131,24 @@ def audio_listening_loop(loop, mqtt_queue, audio_manager, audio_player):
             # ==========================================
             audio_player.stop()
             logger.info(f"Wake Word Detected! (Confidence: {confidence:.2f})")
-            audio_player.play_local_wav(settings.wake_sound, blocking=True)
+            active_suppressor = None
+            if chime_suppressor:
+                # Capture straight away; the chime is cancelled from the recording.
+                # The mic keeps buffering while we wait for the speaker stream to open.
+                audio_player.play_local_wav(settings.wake_sound)
+                chime_start = audio_player.wait_for_playback_start(timeout=1.0)
+                if chime_start is not None:
+                    chime_suppressor.start(chime_start)
+                    active_suppressor = chime_suppressor
+                else:
+                    # Without a start time the chime cannot be cancelled and
+                    # would be recorded as the command
+                    logger.warning(
+                        "Wake sound did not start in time, recording after it instead"
+                    )
+                    audio_player.wait()
+            else:
+                audio_player.play_local_wav(settings.wake_sound, blocking=True)
 
             # Send async event to duck volume / notify other services
             loop.call_soon_threadsafe(
@@ -105,10 +165,14 @@ def audio_listening_loop(loop, mqtt_queue, audio_manager, audio_player):
                 silero_vad,
                 rate=RATE,
                 silence_timeout=settings.silence_timeout,
+                chime_suppressor=active_suppressor,
             )
 
             if audio_recorded:
                 audio_player.play_local_wav(settings.done_sound)
+                audio_recorded = postprocess_command(
+                    audio_recorded, silero_vad, settings, rate=RATE
+                )
                 filename = storage_client.upload_audio(audio_recorded)
 
                 if filename:
@@ -183,6 +247,8 @@ async def main_async():
 
 
 def main():
+    # Exit normally on SIGTERM (systemd/docker stop) so atexit cleanup runs
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     try:
         asyncio.run(main_async())
     except KeyboardInterrupt:
@@ -0,0 +1,360 @@
+import os
+import time
+import struct
+import logging
+import threading
+from multiprocessing import shared_memory, resource_tracker
+
+logger = logging.getLogger("Satellite.MicShare")
+
+# Header layout (little endian):
+#   magic (4s) | version (I) | sample_rate (I) | sample_width (I)
+#   capacity in bytes (Q) | owner pid (Q) | time.time() of the newest sample (d)
+#   bytes claimed by the writer (Q) | bytes fully written (Q)
+HEADER_FORMAT = "<4sIIIQQdQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAGIC = b"VSMS"
+VERSION = 3
+OWNER_PID_OFFSET = struct.calcsize("<4sIIIQ")
+CAPTURE_TIME_OFFSET = struct.calcsize("<4sIIIQQ")
+RESERVE_POS_OFFSET = struct.calcsize("<4sIIIQQd")
+WRITE_POS_OFFSET = struct.calcsize("<4sIIIQQdQ")
+
+
+class LaggingReaderError(Exception):
+    """Raised when a reader fell so far behind that the writer overwrote its data."""
+
+    def __init__(self, lost_bytes):
+        super().__init__(f"Reader lagged behind the capture ring by {lost_bytes} bytes")
+        self.lost_bytes = lost_bytes
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MicSharePublisher:
+    """
+    Publishes the raw microphone stream into a shared-memory ring buffer.
+
+    The writer never waits for readers. Before copying a chunk it claims the
+    region by advancing a reserve counter, and afterwards it advances the
+    write counter. Readers track their own position and detect on their side
+    when the writer has overrun (or is overwriting) the data they read.
+    """
+
+    def __init__(self, name, rate=16000, sample_width=2, buffer_seconds=10.0):
+        self.name = name
+        self.capacity = int(rate * sample_width * buffer_seconds)
+        if self.capacity < sample_width:
+            raise ValueError(
+                f"Microphone share needs a positive size, got {buffer_seconds}s"
+            )
+        self._write_pos = 0
+
+        try:
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=HEADER_SIZE + self.capacity
+            )
+        except FileExistsError:
+            self._remove_stale_segment(name)
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=HEADER_SIZE + self.capacity
+            )
+
+        struct.pack_into(
+            HEADER_FORMAT,
+            self.shm.buf,
+            0,
+            MAGIC,
+            VERSION,
+            rate,
+            sample_width,
+            self.capacity,
+            os.getpid(),
+            0.0,
+            0,
+            0,
+        )
+        logger.info(
+            f"Sharing microphone audio via /dev/shm/{name} ({buffer_seconds}s ring)"
+        )
+
+    @staticmethod
+    def _remove_stale_segment(name):
+        """Unlinks a segment left behind by a crashed satellite, never a live one."""
+        stale = shared_memory.SharedMemory(name=name)
+        try:
+            magic, version, _, _, _, owner_pid, _, _, _ = struct.unpack_from(
+                HEADER_FORMAT, stale.buf, 0
+            )
+        except struct.error:
+            magic, version, owner_pid = None, None, 0
+        stale.close()
+
+        if magic != MAGIC:
+            raise FileExistsError(
+                f"Shared memory '{name}' exists and is not a microphone share"
+            )
+        # Segments of other layout versions cannot tell us their owner
+        if (
+            version == VERSION
+            and owner_pid != os.getpid()
+            and _pid_alive(owner_pid)
+        ):
+            raise FileExistsError(
+                f"Shared memory '{name}' is in use by running process {owner_pid}"
+            )
+
+        logger.warning(f"Replacing stale shared memory segment '{name}'")
+        stale.unlink()
+
+    def publish(self, data, capture_time=None):
+        """
+        Copies a chunk into the ring and advances the shared write counter.
+
+        capture_time is the time.time() of the last sample in the chunk (now if
+        unset). Readers compare it with the bytes read to detect dropped audio.
+        """
+        size = len(data)
+        if size > self.capacity:
+            # Only the newest part of an oversized chunk can ever be read back
+            data = data[-self.capacity :]
+            self._write_pos += size - self.capacity
+            size = self.capacity
+
+        buf = self.shm.buf
+        # Claim the region first so readers can tell it is being overwritten
+        struct.pack_into("<Q", buf, RESERVE_POS_OFFSET, self._write_pos + size)
+
+        start = self._write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        buf[HEADER_SIZE + start : HEADER_SIZE + start + first] = data[:first]
+        if first < size:
+            buf[HEADER_SIZE : HEADER_SIZE + size - first] = data[first:]
+
+        # Publish the counter only after the payload is in place
+        self._write_pos += size
+        struct.pack_into(
+            "<d",
+            buf,
+            CAPTURE_TIME_OFFSET,
+            time.time() if capture_time is None else capture_time,
+        )
+        struct.pack_into("<Q", buf, WRITE_POS_OFFSET, self._write_pos)
+
+    def close(self):
+        if self.shm is None:
+            return
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+
+
+class MicShareReader:
+    """
+    Attaches to a ring buffer created by MicSharePublisher.
+
+    Each reader keeps its own position, so any number of them can consume
+    the stream at their own pace without affecting capture.
+    """
+
+    def __init__(self, name, from_start=False):
+        self.shm = shared_memory.SharedMemory(name=name)
+        magic, version, self.rate, self.sample_width, self.capacity, owner_pid, *_ = (
+            struct.unpack_from(HEADER_FORMAT, self.shm.buf, 0)
+        )
+
+        # Readers must not unlink the segment when they exit (Python < 3.13 tracks
+        # it). Inside the publishing process the registration is the publisher's.
+        if owner_pid != os.getpid():
+            try:
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+            except Exception as e:
+                logger.debug(f"Could not unregister shared memory from tracker: {e}")
+
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"'{name}' is not a voice-satellite microphone share")
+
+        write_pos = self._write_pos()
+        self.position = max(0, write_pos - self.capacity) if from_start else write_pos
+        self.lost_bytes = 0
+
+    def _write_pos(self):
+        return struct.unpack_from("<Q", self.shm.buf, WRITE_POS_OFFSET)[0]
+
+    def _reserve_pos(self):
+        return struct.unpack_from("<Q", self.shm.buf, RESERVE_POS_OFFSET)[0]
+
+    def capture_time(self):
+        """time.time() at which the newest published sample was captured."""
+        return struct.unpack_from("<d", self.shm.buf, CAPTURE_TIME_OFFSET)[0]
+
+    def available(self):
+        """Number of bytes published since the last read."""
+        return self._write_pos() - self.position
+
+    def _copy(self, position, size):
+        start = position % self.capacity
+        first = min(size, self.capacity - start)
+        buf = self.shm.buf
+        data = bytes(buf[HEADER_SIZE + start : HEADER_SIZE + start + first])
+        if first < size:
+            data += bytes(buf[HEADER_SIZE : HEADER_SIZE + size - first])
+        return data
+
+    def read(self, max_bytes=None, skip_on_lag=True):
+        """
+        Returns all bytes published since the last read (up to max_bytes).
+
+        If the writer has lapped this reader, the lost audio is skipped and
+        counted in `lost_bytes`, or LaggingReaderError is raised when
+        skip_on_lag is False.
+        """
+        while True:
+            # Anything the writer has claimed, even if not finished yet, is gone
+            oldest_valid = self._reserve_pos() - self.capacity
+            if self.position < oldest_valid:
+                self._handle_lag(oldest_valid, skip_on_lag)
+
+            behind = self._write_pos() - self.position
+            size = behind if max_bytes is None else min(behind, max_bytes)
+            size -= size % self.sample_width
+            if size <= 0:
+                return b""
+
+            data = self._copy(self.position, size)
+
+            # The writer may have claimed the region while we were copying it
+            if self.position >= self._reserve_pos() - self.capacity:
+                self.position += size
+                return data
+
+    def _handle_lag(self, new_position, skip_on_lag):
+        lost = new_position - self.position
+        if not skip_on_lag:
+            raise LaggingReaderError(lost)
+        logger.warning(f"Microphone share reader lagged, skipped {lost} bytes")
+        self.lost_bytes += lost
+        self.position = new_position
+
+    def close(self):
+        self.shm.close()
+
+
+class CaptureServer:
+    """
+    Reads the microphone in a dedicated thread and publishes every chunk.
+
+    The satellite consumes the same audio through read() and
+    get_read_available(), mirroring the PyAudio stream API, so the share
+    keeps running while the satellite is busy (wake sound, upload, ...).
+    Audio the satellite does not pick up within max_backlog seconds is
+    dropped from its queue only, like a device buffer overflow would.
+    """
+
+    def __init__(
+        self,
+        stream,
+        publisher,
+        chunk=512,
+        rate=16000,
+        sample_width=2,
+        max_backlog=10.0,
+    ):
+        self._stream = stream
+        self._publisher = publisher
+        self.chunk = chunk
+        self.rate = rate
+        self.sample_width = sample_width
+        self._max_backlog = int(max_backlog * rate) * sample_width
+        self._pending = bytearray()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def _capture_loop(self):
+        while self._running:
+            try:
+                data = self._stream.read(self.chunk, exception_on_overflow=False)
+            except Exception as e:
+                logger.error(f"Microphone capture failed: {e}")
+                time.sleep(0.1)
+                continue
+
+            try:
+                self._publisher.publish(data, capture_time=time.time())
+            except Exception as e:
+                logger.error(f"Failed to publish microphone audio: {e}")
+
+            with self._cond:
+                self._pending.extend(data)
+                overflow = len(self._pending) - self._max_backlog
+                if overflow > 0:
+                    overflow += -overflow % self.sample_width
+                    del self._pending[:overflow]
+                self._cond.notify_all()
+
+    def get_read_available(self):
+        with self._cond:
+            return len(self._pending) // self.sample_width
+
+    def read(self, num_frames, exception_on_overflow=True):
+        size = num_frames * self.sample_width
+        with self._cond:
+            while len(self._pending) < size and self._running:
+                self._cond.wait()
+            data = bytes(self._pending[:size])
+            del self._pending[:size]
+        return data
+
+    def close(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
+        self._publisher.close()
+
+
+def main():
+    """Attaches to a microphone share and writes the raw PCM stream to stdout."""
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Write the satellite's shared microphone stream to stdout (s16le)"
+    )
+    parser.add_argument("name", help="Shared memory name (SAT_MIC_SHARE_NAME)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    reader = MicShareReader(args.name)
+    logger.info(f"Attached to '{args.name}' ({reader.rate} Hz)")
+    try:
+        while True:
+            data = reader.read()
+            if data:
+                sys.stdout.buffer.write(data)
+                sys.stdout.buffer.flush()
+            else:
+                time.sleep(0.01)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from audio_processing import SILERO_CHUNK, normalize_gain, trim_silence
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+RATE = 16000
+
+
+class FakeVAD:
+    """Marks a frame as speech when its RMS exceeds a fixed level."""
+
+    def __init__(self, level=500.0):
+        self.level = level
+        self.resets = 0
+
+    def reset_states(self):
+        self.resets += 1
+
+    def process_buffer(self, audio_int16, sr=16000, chunk_size=512):
+        samples = np.frombuffer(audio_int16, dtype=np.int16).astype(np.float32)
+        num_frames = len(samples) // chunk_size
+        frames = samples[: num_frames * chunk_size].reshape(num_frames, chunk_size)
+        rms = np.sqrt(np.mean(frames**2, axis=1))
+        return np.where(rms > self.level, 0.9, 0.05).astype(np.float32)
+
+
+def make_audio(speech_frames, total_frames):
+    """int16 bytes with loud frames at the given frame indices."""
+    samples = np.zeros(total_frames * SILERO_CHUNK, dtype=np.int16)
+    for frame in speech_frames:
+        samples[frame * SILERO_CHUNK : (frame + 1) * SILERO_CHUNK] = 3000
+    return samples.tobytes()
+
+
+def test_trim_keeps_margin_around_speech():
+    audio = make_audio(range(10, 15), 30)
+    trimmed = trim_silence(audio, FakeVAD(), rate=RATE, margin=0.1)
+
+    margin = int(0.1 * RATE)
+    start = 10 * SILERO_CHUNK - margin
+    end = 15 * SILERO_CHUNK + margin
+    assert trimmed == audio[start * 2 : end * 2]
+
+
+def test_trim_clamps_margin_at_start():
+    audio = make_audio(range(0, 3), 30)
+    trimmed = trim_silence(audio, FakeVAD(), rate=RATE, margin=0.5)
+    assert trimmed == audio[: (3 * SILERO_CHUNK + 8000) * 2]
+
+
+def test_trim_clamps_margin_at_end():
+    audio = make_audio(range(27, 30), 30)
+    trimmed = trim_silence(audio, FakeVAD(), rate=RATE, margin=0.5)
+    assert trimmed == audio[(27 * SILERO_CHUNK - 8000) * 2 :]
+
+
+def test_trim_without_speech_returns_input():
+    audio = make_audio([], 30)
+    vad = FakeVAD()
+    assert trim_silence(audio, vad, rate=RATE) is audio
+    # The live VAD state must not be left dirty by the trimming pass
+    assert vad.resets == 2
+
+
+def test_trim_stored_clip():
+    # command.wav: 1.0 s room noise, 0.8 s speech-like signal, 1.5 s room noise
+    with wave.open(os.path.join(DATA_DIR, "command.wav"), "rb") as wf:
+        assert (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (1, 2, RATE)
+        audio = wf.readframes(wf.getnframes())
+
+    trimmed = trim_silence(audio, FakeVAD(), rate=RATE, margin=0.2)
+
+    duration = len(trimmed) / (2 * RATE)
+    assert duration == pytest.approx(0.8 + 2 * 0.2, abs=0.1)
+    assert len(trimmed) < len(audio) / 2
+
+
+def test_normalize_all_zero_buffer_is_unchanged():
+    audio = np.zeros(1000, dtype=np.int16).tobytes()
+    assert normalize_gain(audio) == audio
+
+
+def test_normalize_empty_buffer_is_unchanged():
+    assert normalize_gain(b"") == b""
+
+
+def test_normalize_hits_target_peak():
+    audio = np.array([0, 8000, -16000], dtype=np.int16).tobytes()
+    out = np.frombuffer(normalize_gain(audio, target_dbfs=-6.0), dtype=np.int16)
+    assert np.max(np.abs(out)) == pytest.approx(32767 * 10 ** (-6 / 20), abs=2)
+
+
+def test_normalize_gain_is_capped():
+    audio = np.array([100, -50], dtype=np.int16).tobytes()
+    out = np.frombuffer(normalize_gain(audio, max_gain_db=20.0), dtype=np.int16)
+    assert list(out) == [1000, -500]
+
+
+def test_process_buffer_matches_per_chunk_process():
+    pytest.importorskip("onnxruntime")
+    from vad import SileroVAD
+
+    # Stand-in with Silero's input/output signature (input, state, sr -> output, stateN)
+    model_path = os.path.join(DATA_DIR, "stand_in_vad.onnx")
+    rng = np.random.default_rng(0)
+    chunks = [
+        rng.integers(-3000, 3000, SILERO_CHUNK, dtype=np.int16).tobytes()
+        for _ in range(20)
+    ]
+
+    vad = SileroVAD(model_path)
+    expected = [vad.process(chunk) for chunk in chunks]
+    expected_state = vad.state.copy()
+
+    vad.reset_states()
+    # A trailing partial frame is ignored
+    probs = vad.process_buffer(b"".join(chunks) + b"\0\0", chunk_size=SILERO_CHUNK)
+    np.testing.assert_allclose(probs, expected, rtol=1e-6)
+    np.testing.assert_allclose(vad.state, expected_state, rtol=1e-6)
+
+    # Chunk sizes without preallocated buffers take the fallback path
+    vad.reset_states()
+    fallback = SileroVAD(model_path, chunk_size=SILERO_CHUNK * 2)
+    np.testing.assert_allclose(
+        fallback.process_buffer(b"".join(chunks), chunk_size=SILERO_CHUNK),
+        expected,
+        rtol=1e-6,
+    )
@@ -0,0 +1,225 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pydub")
+
+import audio_io
+from audio_io import record_until_silence
+from audio_processing import ChimeSuppressor
+
+RATE = 16000
+CHUNK = 512
+ECHO_DELAY = int(0.06 * RATE)
+ECHO_GAIN = 0.4
+
+
+def make_chime(seconds=1.0):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (8000 * np.sin(2 * np.pi * 880 * t) * np.exp(-t)).astype(np.float32)
+
+
+def with_echo(reference, total, chime_offset=0):
+    """Mic signal containing only the chime echo, chime_offset samples in."""
+    signal = np.zeros(total, dtype=np.float32)
+    start = chime_offset + ECHO_DELAY
+    end = min(total, start + len(reference))
+    signal[start:end] += ECHO_GAIN * reference[: end - start]
+    return signal
+
+
+def to_bytes(signal):
+    return np.clip(signal, -32768, 32767).astype(np.int16).tobytes()
+
+
+def cancellation_db(suppressor, signal, times):
+    """Echo energy before vs after suppression over all chunks."""
+    before = after = 0.0
+    for i, capture_time in enumerate(times):
+        chunk = signal[i * CHUNK : (i + 1) * CHUNK]
+        cleaned, _ = suppressor.process(to_bytes(chunk), capture_time)
+        residual = np.frombuffer(cleaned, dtype=np.int16).astype(np.float64)
+        before += float(np.sum(chunk.astype(np.float64) ** 2))
+        after += float(np.sum(residual**2))
+    return 10 * np.log10(before / max(after, 1.0))
+
+
+def test_suppressor_locks_lag_and_cancels_echo():
+    reference = make_chime()
+    suppressor = ChimeSuppressor(reference, rate=RATE)
+    suppressor.start(100.0)
+
+    num_chunks = (len(reference) + ECHO_DELAY) // CHUNK
+    signal = with_echo(reference, num_chunks * CHUNK)
+    times = [100.0 + (i + 1) * CHUNK / RATE for i in range(num_chunks)]
+
+    assert cancellation_db(suppressor, signal, times) > 20
+    assert suppressor._lag == ECHO_DELAY
+
+
+def test_suppressor_follows_small_timing_drift():
+    reference = make_chime()
+    suppressor = ChimeSuppressor(reference, rate=RATE)
+    suppressor.start(100.0)
+
+    num_chunks = (len(reference) + ECHO_DELAY) // CHUNK
+    signal = with_echo(reference, num_chunks * CHUNK)
+    # Timestamps drift by 1 ms halfway through the chime
+    times = [
+        100.0 + (i + 1) * CHUNK / RATE + (0.001 if i > num_chunks // 2 else 0.0)
+        for i in range(num_chunks)
+    ]
+
+    assert cancellation_db(suppressor, signal, times) > 15
+
+
+def test_suppressor_ignores_chunks_without_chime():
+    suppressor = ChimeSuppressor(make_chime(0.2), rate=RATE)
+    suppressor.start(100.0)
+    data = to_bytes(np.full(CHUNK, 1000.0))
+
+    # Before the chime starts and long after it is over
+    assert suppressor.process(data, 99.0) == (data, False)
+    assert suppressor.process(data, 105.0) == (data, False)
+
+
+class FakeClock:
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+
+class FakeMic:
+    """Plays back a prepared signal; wall-clock read times jitter like real reads."""
+
+    def __init__(self, clock, signal, jitter=0.0):
+        self.clock = clock
+        self.start = clock.now
+        self.signal = signal
+        self.jitter = jitter
+        self.position = 0
+        self.rng = np.random.default_rng(0)
+
+    def get_read_available(self):
+        return 0
+
+    def read(self, num_frames, exception_on_overflow=True):
+        chunk = np.zeros(num_frames, dtype=np.float32)
+        part = self.signal[self.position : self.position + num_frames]
+        chunk[: len(part)] = part
+        self.position += num_frames
+        self.clock.now = (
+            self.start
+            + self.position / RATE
+            + self.rng.uniform(-self.jitter, self.jitter)
+        )
+        return to_bytes(chunk)
+
+
+class FakeVAD:
+    """Reports speech for loud chunks, so uncancelled chime echo counts as speech."""
+
+    def reset_states(self):
+        pass
+
+    def process(self, data, sr=16000):
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        return 0.9 if np.sqrt(np.mean(samples**2)) > 500 else 0.05
+
+
+def speech(total, start, end, seed=1):
+    rng = np.random.default_rng(seed)
+    signal = np.zeros(total, dtype=np.float32)
+    signal[int(start * RATE) : int(end * RATE)] = rng.normal(
+        0, 3000, int(end * RATE) - int(start * RATE)
+    )
+    return signal
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(audio_io, "time", fake)
+    return fake
+
+
+def record(clock, signal, suppressor=None, jitter=0.0, silence_timeout=1.0):
+    mic = FakeMic(clock, signal, jitter=jitter)
+    audio = record_until_silence(
+        mic,
+        FakeVAD(),
+        rate=RATE,
+        silence_timeout=silence_timeout,
+        chime_suppressor=suppressor,
+    )
+    return np.frombuffer(audio, dtype=np.int16), mic
+
+
+def test_chime_alone_is_not_recorded_despite_read_jitter(clock):
+    reference = make_chime()
+    suppressor = ChimeSuppressor(reference, rate=RATE)
+    suppressor.start(clock.now)
+
+    signal = with_echo(reference, 6 * RATE)
+    recorded, _ = record(clock, signal, suppressor, jitter=0.002)
+    assert len(recorded) == 0
+
+
+def test_speech_over_chime_is_recorded(clock):
+    reference = make_chime()
+    suppressor = ChimeSuppressor(reference, rate=RATE)
+    suppressor.start(clock.now)
+
+    total = 6 * RATE
+    spoken = speech(total, 0.2, 0.6)
+    recorded, _ = record(clock, with_echo(reference, total) + spoken, suppressor)
+
+    assert len(recorded) / RATE >= 0.4
+    # The loud part of the recording is the speech, not the chime
+    loud = np.sum(np.abs(recorded.astype(np.float32)) > 3000)
+    assert loud > 0.1 * 0.4 * RATE
+
+
+def test_no_speech_timeout_is_held_while_chime_plays(clock):
+    # The chime outlasts the 3 s no-speech timeout; speech follows it
+    reference = make_chime(3.5)
+    suppressor = ChimeSuppressor(reference, rate=RATE)
+    suppressor.start(clock.now)
+
+    total = 8 * RATE
+    signal = with_echo(reference, total) + speech(total, 4.0, 4.5)
+    recorded, _ = record(clock, signal, suppressor)
+    assert len(recorded) / RATE >= 0.5
+
+
+def test_silence_timeout_is_held_while_chime_plays(clock):
+    reference = make_chime(2.5)
+    suppressor = ChimeSuppressor(reference, rate=RATE)
+    suppressor.start(clock.now)
+
+    total = 8 * RATE
+    signal = with_echo(reference, total) + speech(total, 0.0, 0.3)
+    _, mic = record(clock, signal, suppressor, silence_timeout=1.0)
+
+    # Recording went on until the chime was over, plus the silence timeout
+    assert mic.position / RATE >= 2.5 + 1.0
+
+
+def test_recording_without_chime_is_contiguous(clock):
+    total = 6 * RATE
+    rng = np.random.default_rng(2)
+    # Quiet noise makes every chunk unique so splices can be detected
+    signal = rng.normal(0, 20, total).astype(np.float32) + speech(total, 0.5, 1.5)
+    recorded, _ = record(clock, signal, silence_timeout=2.0)
+
+    stream = np.frombuffer(to_bytes(signal), dtype=np.int16)
+    first = np.flatnonzero(
+        [
+            np.array_equal(stream[i : i + CHUNK], recorded[:CHUNK])
+            for i in range(0, total, CHUNK)
+        ]
+    )
+    assert len(first) == 1
+    start = first[0] * CHUNK
+    assert np.array_equal(recorded, stream[start : start + len(recorded)])
@@ -0,0 +1,162 @@
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from mic_share import (
+    OWNER_PID_OFFSET,
+    CaptureServer,
+    RESERVE_POS_OFFSET,
+    LaggingReaderError,
+    MicSharePublisher,
+    MicShareReader,
+)
+
+# 100 Hz * 2 bytes * 1 s = 200 byte ring
+RING = dict(rate=100, sample_width=2, buffer_seconds=1)
+SOURCE = bytes(range(256)) * 8
+
+
+@pytest.fixture
+def publisher():
+    pub = MicSharePublisher(f"vs_test_{os.getpid()}", **RING)
+    yield pub
+    pub.close()
+
+
+def test_reads_across_ring_boundary(publisher):
+    reader = MicShareReader(publisher.name)
+    for start in range(0, 600, 60):
+        publisher.publish(SOURCE[start : start + 60])
+        assert reader.read() == SOURCE[start : start + 60]
+    assert reader.lost_bytes == 0
+    reader.close()
+
+
+def test_lapped_reader_skips_lost_audio(publisher):
+    reader = MicShareReader(publisher.name)
+    publisher.publish(SOURCE[:150])
+    publisher.publish(SOURCE[150:450])
+    assert reader.read() == SOURCE[250:450]
+    assert reader.lost_bytes == 250
+    reader.close()
+
+
+def test_lapped_reader_can_raise(publisher):
+    reader = MicShareReader(publisher.name)
+    publisher.publish(SOURCE[:300])
+    with pytest.raises(LaggingReaderError):
+        reader.read(skip_on_lag=False)
+    reader.close()
+
+
+def test_write_during_copy_is_detected(publisher):
+    # Reader sits exactly one ring behind, then the writer overwrites the
+    # region while the reader is copying it
+    reader = MicShareReader(publisher.name, from_start=True)
+    publisher.publish(SOURCE[:200])
+    assert reader.position == 0
+
+    copy = reader._copy
+    interleaved = []
+
+    def copy_while_writing(position, size):
+        data = copy(position, size)
+        if not interleaved:
+            interleaved.append(True)
+            publisher.publish(SOURCE[200:260])
+        return data
+
+    reader._copy = copy_while_writing
+    assert reader.read() == SOURCE[60:260]
+    assert reader.lost_bytes == 60
+    reader.close()
+
+
+def test_in_progress_write_counts_as_lost(publisher):
+    reader = MicShareReader(publisher.name)
+    publisher.publish(SOURCE[:180])
+    assert reader.read(max_bytes=20) == SOURCE[:20]
+
+    # Writer has claimed the next 60 bytes but not finished copying them
+    struct.pack_into("<Q", publisher.shm.buf, RESERVE_POS_OFFSET, 240)
+    assert reader.read() == SOURCE[40:180]
+    assert reader.lost_bytes == 20
+
+    publisher.publish(SOURCE[180:240])
+    assert reader.read() == SOURCE[180:240]
+    reader.close()
+
+
+def test_live_segment_is_not_replaced(publisher):
+    # Pretend another running process owns the segment
+    struct.pack_into("<Q", publisher.shm.buf, OWNER_PID_OFFSET, os.getppid())
+    with pytest.raises(FileExistsError):
+        MicSharePublisher(publisher.name, **RING)
+
+
+def test_stale_segment_of_dead_process_is_replaced(publisher):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    struct.pack_into("<Q", publisher.shm.buf, OWNER_PID_OFFSET, dead.pid)
+
+    replacement = MicSharePublisher(publisher.name, **RING)
+    reader = MicShareReader(publisher.name)
+    replacement.publish(SOURCE[:10])
+    assert reader.read() == SOURCE[:10]
+    reader.close()
+    replacement.close()
+
+
+def test_zero_sized_share_is_rejected():
+    with pytest.raises(ValueError):
+        MicSharePublisher(f"vs_test_zero_{os.getpid()}", buffer_seconds=0)
+
+
+def test_capture_time_is_published(publisher):
+    reader = MicShareReader(publisher.name)
+    publisher.publish(SOURCE[:10], capture_time=1234.5)
+    assert reader.capture_time() == 1234.5
+    reader.close()
+
+
+class FakeStream:
+    """Blocking mic stream that hands out consecutive slices of SOURCE."""
+
+    def __init__(self):
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def read(self, num_frames, exception_on_overflow=True):
+        time.sleep(0.001)
+        with self.lock:
+            size = num_frames * 2
+            data = (SOURCE * 64)[self.position : self.position + size]
+            self.position += size
+        return data
+
+
+def test_capture_server_publishes_while_consumer_is_idle(publisher):
+    reader = MicShareReader(publisher.name)
+    stream = FakeStream()
+    server = CaptureServer(stream, publisher, chunk=5, rate=100, max_backlog=100)
+    try:
+        # The satellite does not read, yet the share keeps receiving audio
+        deadline = time.time() + 2.0
+        received = b""
+        while len(received) < 100 and time.time() < deadline:
+            received += reader.read()
+            time.sleep(0.005)
+        assert received[:100] == (SOURCE * 64)[:100]
+
+        # The satellite later gets the same audio through the stream API
+        assert server.get_read_available() >= 50
+        assert server.read(50) == (SOURCE * 64)[:100]
+    finally:
+        server._running = False
+        server._thread.join(timeout=2.0)
+        reader.close()
@@ -22,25 +22,119 @@ def ensure_silero_vad_model():
     return model_path
 
 class SileroVAD:
-    def __init__(self, model_path):
+    """
+    Streaming Silero VAD with an allocation-free hot path.
+
+    Inputs, outputs and the recurrent state live in preallocated numpy
+    buffers that are bound to the session once via IOBinding. The state is
+    ping-ponged between two buffers, so each chunk only costs an in-place
+    int16 -> float32 conversion and a run of the bound session.
+    """
+
+    def __init__(self, model_path, chunk_size=512, sr=16000):
         options = ort.SessionOptions()
         options.inter_op_num_threads = 1
         options.intra_op_num_threads = 1
         self.session = ort.InferenceSession(model_path, sess_options=options)
-        self.reset_states()
+
+        self.chunk_size = chunk_size
+        self._scale = np.float32(1.0 / 32768.0)
+        self._input = np.zeros((1, chunk_size), dtype=np.float32)
+        self._input_row = self._input[0]
+        self._sr = np.array(sr, dtype=np.int64)
+        self._sr_value = sr
+        self._output = np.zeros((1, 1), dtype=np.float32)
+        self._states = (
+            np.zeros((2, 1, 128), dtype=np.float32),
+            np.zeros((2, 1, 128), dtype=np.float32),
+        )
+        self._current = 0
+        # Binding i reads the state from buffer i and writes the next one to 1 - i
+        self._bindings = (self._bind(0, 1), self._bind(1, 0))
+
+    def _bind(self, state_in, state_out):
+        binding = self.session.io_binding()
+        for name, array in (
+            ("input", self._input),
+            ("state", self._states[state_in]),
+            ("sr", self._sr),
+        ):
+            binding.bind_input(
+                name, "cpu", 0, array.dtype, array.shape, array.ctypes.data
+            )
+        for name, array in (
+            ("output", self._output),
+            ("stateN", self._states[state_out]),
+        ):
+            binding.bind_output(
+                name, "cpu", 0, array.dtype, array.shape, array.ctypes.data
+            )
+        return binding
+
+    @property
+    def state(self):
+        return self._states[self._current]
 
     def reset_states(self):
-        self.state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._states[0].fill(0.0)
+        self._states[1].fill(0.0)
+        self._current = 0
 
-    def process(self, audio_chunk_int16, sr=16000):
-        audio_float32 = (
-            np.frombuffer(audio_chunk_int16, dtype=np.int16).astype(np.float32) / 32768.0
+    def _run_bound(self):
+        self.session.run_with_iobinding(self._bindings[self._current])
+        self._current ^= 1
+        return self._output[0, 0]
+
+    def _run_unbound(self, audio_float32, sr):
+        # Fallback for chunk sizes the buffers were not allocated for
+        out, state = self.session.run(
+            None,
+            {
+                "input": audio_float32.reshape(1, -1),
+                "state": self.state,
+                "sr": np.array(sr, dtype=np.int64),
+            },
         )
-        ort_inputs = {
-            "input": np.expand_dims(audio_float32, axis=0),
-            "state": self.state,
-            "sr": np.array(sr, dtype=np.int64),
-        }
-        ort_outs = self.session.run(None, ort_inputs)
-        out, self.state = ort_outs
+        np.copyto(self.state, state)
         return out[0][0]
+
+    def process(self, audio_chunk_int16, sr=16000):
+        """Returns the speech probability of one chunk (bytes or an int16 array)."""
+        samples = np.frombuffer(audio_chunk_int16, dtype=np.int16)
+        if sr != self._sr_value:
+            self._sr.fill(sr)
+            self._sr_value = sr
+
+        if samples.shape[0] != self.chunk_size:
+            return self._run_unbound(samples * self._scale, sr)
+
+        # Cast into the bound buffer and scale in place; a mixed-dtype ufunc
+        # would allocate a casting buffer on every call
+        np.copyto(self._input_row, samples, casting="unsafe")
+        np.multiply(self._input_row, self._scale, out=self._input_row)
+        return self._run_bound()
+
+    def process_buffer(self, audio_int16, sr=16000, chunk_size=512):
+        """
+        Returns one speech probability per chunk_size frame of a whole utterance.
+
+        The int16 -> float32 conversion and framing are done once for the full
+        buffer. The model is recurrent, so frames still run in order with the
+        state carried over; a trailing partial frame is ignored.
+        """
+        samples = np.frombuffer(audio_int16, dtype=np.int16)
+        num_frames = len(samples) // chunk_size
+        frames = samples[: num_frames * chunk_size].reshape(num_frames, chunk_size)
+        frames = frames * self._scale
+        if sr != self._sr_value:
+            self._sr.fill(sr)
+            self._sr_value = sr
+
+        probs = np.empty(num_frames, dtype=np.float32)
+        for i in range(num_frames):
+            if chunk_size == self.chunk_size:
+                np.copyto(self._input_row, frames[i])
+                probs[i] = self._run_bound()
+            else:
+                probs[i] = self._run_unbound(frames[i], sr)
+        return probs